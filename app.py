@@ -1,83 +1,335 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request
 from flask_cors import CORS
+from flask_caching import Cache
 from config import Config
-from predict import WeatherPredictor
+from predict import WeatherPredictor, aqi_category
 from data_collector import WeatherDataCollector
-import pandas as pd
+import csv
+import orjson
 import os
+import re
+import threading
+import time
 
 # ============================================================
 # APP SETUP
 # ============================================================
 app = Flask(__name__)
 CORS(app)
+cache = Cache(app, config={"CACHE_TYPE": Config.CACHE_TYPE})
 
 # Initialize configuration
 Config.init_app()
 
-# Initialize ML & data components
+# Initialize ML & data components (trained artifacts are loaded once into the
+# process-wide cache before the first request)
+WeatherPredictor.preload()
 predictor = WeatherPredictor()
-collector = WeatherDataCollector()
+collector = WeatherDataCollector(retry=False)
+
+# Static for the process lifetime, so serialized once at import
+CITIES_JSON = orjson.dumps({"success": True, "cities": Config.CITIES})
+
+# Chat intents: one regex scan per message instead of a substring test per keyword
+WEATHER_RE = re.compile(r"weather|temperature|forecast")
+AQI_RE = re.compile(r"aqi|air|pollution")
+
+# Chat replies, filled from the prediction's "current" block
+WEATHER_TEMPLATE = (
+    "🌍 Weather in {city}\n\n"
+    "🌡️ Temp: {temperature}°C (Feels {feels_like}°C)\n"
+    "☁️ {weather} - {description}\n"
+    "💧 Humidity: {humidity}%\n"
+    "💨 Wind: {wind_speed} m/s\n\n"
+    "🏭 AQI: {aqi_category} ({aqi})\n\n"
+    "💡 {health_advice}"
+)
+
+AQI_TEMPLATE = (
+    "💨 Air Quality in {city}\n\n"
+    "AQI: {aqi_category} ({aqi})\n"
+    "PM2.5: {pm2_5} µg/m³\n"
+    "PM10: {pm10} µg/m³\n\n"
+    "💡 {health_advice}"
+)
 
 # ============================================================
-# LOAD SAMPLE DATA (SAFE)
+# HELPER FUNCTIONS
 # ============================================================
-sample_data = None
-has_data = False
+def ojsonify(obj, status=200):
+    """jsonify replacement serialized with orjson"""
+    return Response(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype="application/json"
+    )
+
+
+def request_json():
+    """Parse the request body with orjson"""
+    return orjson.loads(request.get_data() or b"{}")
+
+
+def _native_row(row):
+    """Cast a dataset row to plain Python values once"""
+    return {
+        "timestamp": str(row["timestamp"]),
+        "temperature": float(row["temperature"]),
+        "feels_like": float(row["feels_like"]),
+        "humidity": int(float(row["humidity"])),
+        "pressure": int(float(row["pressure"])),
+        "wind_speed": float(row["wind_speed"]),
+        "clouds": int(float(row["clouds"])),
+        "weather_main": str(row["weather_main"]),
+        "weather_description": str(row["weather_description"]),
+        "aqi": int(float(row["aqi"])),
+        "pm2_5": float(row["pm2_5"]),
+        "pm10": float(row["pm10"])
+    }
+
+
+def _response_template(city, latest, category):
+    """Pre-form the fallback payload (including health advice) for one city"""
+    return {
+        "city": city,
+        "timestamp": latest["timestamp"],
+        "current": {
+            "temperature": latest["temperature"],
+            "feels_like": latest["feels_like"],
+            "humidity": latest["humidity"],
+            "pressure": latest["pressure"],
+            "wind_speed": latest["wind_speed"],
+            "clouds": latest["clouds"],
+            "weather": latest["weather_main"],
+            "description": latest["weather_description"],
+            "aqi": latest["aqi"],
+            "aqi_category": category,
+            "pm2_5": latest["pm2_5"],
+            "pm10": latest["pm10"]
+        },
+        "health_advice": predictor.get_health_advice(latest["aqi"], latest["pm2_5"])
+    }
 
-try:
-    if os.path.exists(Config.DATASET_FILE):
-        sample_data = pd.read_csv(Config.DATASET_FILE)
-        has_data = len(sample_data) > 0
-        print(f"✅ Loaded {len(sample_data)} sample records")
-    else:
-        print("⚠️ Dataset file not found")
-except Exception as e:
-    print(f"⚠️ Failed to load sample data: {e}")
 
 # ============================================================
-# HELPER FUNCTIONS
+# LOAD SAMPLE DATA (SAFE, reloaded when the dataset changes)
 # ============================================================
-def get_aqi_category(aqi):
-    categories = {
-        1: "Good",
-        2: "Fair",
-        3: "Moderate",
-        4: "Poor",
-        5: "Very Poor"
+has_data = False
+
+# Latest row per city, indexed once per dataset version
+LATEST_BY_CITY = {}
+LATEST_FALLBACK = None
+AQI_CATEGORY_BY_CITY = {}
+
+_data_mtime = None
+_data_lock = threading.Lock()
+
+
+def _dataset_mtime():
+    """Modification time of the dataset CSV, or None if it is missing"""
+    try:
+        return os.path.getmtime(Config.DATASET_FILE)
+    except OSError:
+        return None
+
+
+TAIL_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_csv_line(line):
+    return next(csv.reader([line.decode("utf-8")]))
+
+
+def _read_latest_rows():
+    """Read the CSV backwards until the latest valid row of every tracked city is found"""
+    wanted = set(Config.CITIES)
+    latest = {}
+    last_row = None
+
+    with open(Config.DATASET_FILE, "rb") as f:
+        header_line = f.readline()
+        if not header_line.strip():
+            return latest, last_row
+        header = _parse_csv_line(header_line.rstrip(b"\r\n"))
+        data_start = f.tell()
+        pos = os.fstat(f.fileno()).st_size
+        partial = b""
+
+        # Falls through to a full (backwards) scan if some cities never appear
+        while pos > data_start and not wanted.issubset(latest):
+            size = min(TAIL_CHUNK_SIZE, pos - data_start)
+            pos -= size
+            f.seek(pos)
+            lines = (f.read(size) + partial).split(b"\n")
+            # The first piece is incomplete unless the chunk starts right after the header
+            partial = lines.pop(0) if pos > data_start else b""
+
+            for line in reversed(lines):
+                line = line.rstrip(b"\r")
+                if not line:
+                    continue
+                row = dict(zip(header, _parse_csv_line(line)))
+                city = row.get("city")
+                if city in latest:
+                    continue
+                # Coerce only candidate rows; one with empty/invalid cells (e.g. a
+                # missing pm2_5 from the API) is skipped and the scan keeps going
+                try:
+                    native = _native_row(row)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if last_row is None:
+                    last_row = native
+                latest[city] = native
+
+    return latest, last_row
+
+
+def load_sample_data():
+    """(Re)load the dataset and rebuild the latest-row-per-city index"""
+    global has_data, LATEST_BY_CITY, LATEST_FALLBACK, AQI_CATEGORY_BY_CITY, _data_mtime
+
+    _data_mtime = _dataset_mtime()
+    try:
+        latest_rows, fallback_row = _read_latest_rows()
+        print(f"✅ Loaded latest sample records for {len(latest_rows)} cities")
+    except FileNotFoundError:
+        print("⚠️ Dataset file not found")
+        return
+    except Exception as e:
+        print(f"⚠️ Failed to load sample data: {e}")
+        return
+
+    has_data = fallback_row is not None
+    if not has_data:
+        return
+
+    AQI_CATEGORY_BY_CITY = {
+        city: aqi_category(row["aqi"])
+        for city, row in latest_rows.items()
     }
-    return categories.get(aqi, "Unknown")
+    LATEST_BY_CITY = {
+        city: _response_template(city, row, AQI_CATEGORY_BY_CITY[city])
+        for city, row in latest_rows.items()
+    }
+    LATEST_FALLBACK = _response_template(None, fallback_row, aqi_category(fallback_row["aqi"]))
+
+
+def _refresh_sample_data():
+    """Reload the index if the collector has written new data"""
+    if _dataset_mtime() == _data_mtime:
+        return
+    with _data_lock:
+        if _dataset_mtime() != _data_mtime:
+            load_sample_data()
+
+
+load_sample_data()
 
 
 def get_sample_city_data(city):
     """Fallback data if live API fails"""
+    _refresh_sample_data()
     if not has_data:
         return None
 
-    city_data = sample_data[sample_data["city"] == city]
-    if city_data.empty:
-        city_data = sample_data
+    # Shared, pre-formed payloads: callers must treat them as read-only
+    latest = LATEST_BY_CITY.get(city)
+    if latest is None:
+        latest = {**LATEST_FALLBACK, "city": city}
+    return latest
 
-    latest = city_data.iloc[-1]
 
-    return {
-        "city": city,
-        "timestamp": str(latest["timestamp"]),
-        "current": {
-            "temperature": float(latest["temperature"]),
-            "feels_like": float(latest["feels_like"]),
-            "humidity": int(latest["humidity"]),
-            "pressure": int(latest["pressure"]),
-            "wind_speed": float(latest["wind_speed"]),
-            "clouds": int(latest["clouds"]),
-            "weather": str(latest["weather_main"]),
-            "description": str(latest["weather_description"]),
-            "aqi": int(latest["aqi"]),
-            "aqi_category": get_aqi_category(int(latest["aqi"])),
-            "pm2_5": float(latest["pm2_5"]),
-            "pm10": float(latest["pm10"])
-        }
-    }
+# ============================================================
+# CACHED PREDICTIONS
+# ============================================================
+_prediction_cache = {}
+_prediction_cache_lock = threading.Lock()
+
+# Fixed pool of fetch locks picked by hash(city), so locks are never discarded
+# while another request holds or waits on one
+PREDICTION_LOCK_COUNT = 32
+_prediction_locks = [threading.Lock() for _ in range(PREDICTION_LOCK_COUNT)]
+
+
+def cached_predict(city):
+    """predictor.predict_for_city with a short per-city TTL cache"""
+    entry = _prediction_cache.get(city)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    # Concurrent requests for the same city wait for one live fetch
+    with _prediction_locks[hash(city) % PREDICTION_LOCK_COUNT]:
+        entry = _prediction_cache.get(city)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        result = predictor.predict_for_city(city)
+        # Failed fetches are retried on the next request instead of being pinned for the TTL
+        if not result or "error" in result:
+            return result
+
+        with _prediction_cache_lock:
+            if city not in _prediction_cache and len(_prediction_cache) >= Config.PREDICTION_CACHE_SIZE:
+                _prediction_cache.pop(next(iter(_prediction_cache)))
+            _prediction_cache[city] = (time.monotonic() + Config.PREDICTION_CACHE_TTL, result)
+        return result
+
+
+def _resolve_predictions(city):
+    """Live predictions for a city, falling back to the latest sample row"""
+    try:
+        predictions = cached_predict(city)
+        if predictions and "error" not in predictions:
+            return predictions
+    except Exception:
+        pass
+    return get_sample_city_data(city)
+
+
+_rendered = {}
+
+
+def _render(city, predictions):
+    """orjson bytes of a predictions payload, reused until the payload object changes"""
+    entry = _rendered.get(city)
+    if entry is not None and entry[0] is predictions:
+        return entry[1]
+
+    body = orjson.dumps(predictions, option=orjson.OPT_SERIALIZE_NUMPY)
+    if len(_rendered) >= Config.PREDICTION_CACHE_SIZE:
+        _rendered.pop(next(iter(_rendered)), None)
+    # Holding the payload keeps its identity unique while the entry lives
+    _rendered[city] = (predictions, body)
+    return body
+
+
+def _json_bytes_response(body, status=200):
+    """Response for an already-serialized JSON body"""
+    return Response(body, status=status, mimetype="application/json")
+
+
+# Precompressed siblings written by create_dashboard, in order of preference
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _precompressed_response(path):
+    """Serve a precompressed copy of a generated page, if the client accepts one"""
+    # werkzeug parses the q-values, so an explicit refusal such as "br;q=0" scores 0
+    for encoding, ext in PRECOMPRESSED_ENCODINGS:
+        if request.accept_encodings[encoding] > 0 and os.path.exists(path + ext):
+            with open(path + ext, "rb") as f:
+                response = Response(f.read(), mimetype="text/html")
+            response.headers["Content-Encoding"] = encoding
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+    return None
+
+
+# Warm the JIT-compiled advice thresholds before real traffic. No live fetch
+# happens here: under gunicorn --preload this runs in the master, and sockets
+# or locks created before fork would be shared by every worker.
+predictor.get_health_advice(1, 0.0)
 
 # ============================================================
 # ROUTES
@@ -91,7 +343,11 @@ def index():
 def dashboard():
     try:
         from dashboard import create_dashboard
-        create_dashboard()
+        dashboard_file = create_dashboard()
+        if dashboard_file:
+            response = _precompressed_response(dashboard_file)
+            if response is not None:
+                return response
         return render_template("dashboard.html")
     except Exception as e:
         return f"Dashboard error: {e}", 500
@@ -100,111 +356,87 @@ def dashboard():
 @app.route("/api/predict", methods=["POST"])
 def predict():
     try:
-        data = request.get_json()
+        data = request_json()
         city = data.get("city", Config.DEFAULT_CITY)
 
-        # Try real-time prediction
-        try:
-            predictions = predictor.predict_for_city(city)
-            if predictions and "error" not in predictions:
-                return jsonify({"success": True, "data": predictions})
-        except:
-            pass
-
-        # Fallback to sample data
-        fallback = get_sample_city_data(city)
-        if fallback:
-            fallback["health_advice"] = predictor.get_health_advice(
-                fallback["current"]["aqi"],
-                fallback["current"]["pm2_5"]
-            )
-            return jsonify({"success": True, "data": fallback})
+        predictions = _resolve_predictions(city)
+        if predictions:
+            return _json_bytes_response(b'{"success":true,"data":' + _render(city, predictions) + b'}')
 
-        return jsonify({
+        return ojsonify({
             "success": False,
             "error": "No data available. Run generate_sample_data.py."
-        }), 404
+        }, 404)
 
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return ojsonify({"success": False, "error": str(e)}, 500)
 
 
 @app.route("/api/weather/<city>")
+@cache.cached(timeout=Config.WEATHER_CACHE_TIMEOUT, response_filter=lambda r: r.status_code == 200)
 def get_weather(city):
     try:
         data = collector.fetch_weather_data(city)
         if not data:
-            return jsonify({"success": False, "error": "City not found"}), 404
-        return jsonify({"success": True, "data": data})
+            return ojsonify({"success": False, "error": "City not found"}, 404)
+        return ojsonify({"success": True, "data": data})
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return ojsonify({"success": False, "error": str(e)}, 500)
 
 
 @app.route("/api/cities")
 def get_cities():
-    return jsonify({"success": True, "cities": Config.CITIES})
+    return Response(CITIES_JSON, mimetype="application/json")
 
 
 @app.route("/api/chat", methods=["POST"])
 def chat():
     try:
-        payload = request.get_json()
+        payload = request_json()
         message = payload.get("message", "").lower()
         city = payload.get("city", Config.DEFAULT_CITY)
 
-        try:
-            predictions = predictor.predict_for_city(city)
-            if "error" in predictions:
-                raise Exception
-        except:
-            predictions = get_sample_city_data(city)
-            if not predictions:
-                return jsonify({
-                    "success": False,
-                    "reply": "No data available. Run generate_sample_data.py."
-                })
-
-            predictions["health_advice"] = predictor.get_health_advice(
-                predictions["current"]["aqi"],
-                predictions["current"]["pm2_5"]
-            )
+        predictions = _resolve_predictions(city)
+        if not predictions:
+            return ojsonify({
+                "success": False,
+                "reply": "No data available. Run generate_sample_data.py."
+            })
+
+        ctx = {
+            **predictions["current"],
+            "city": city,
+            "health_advice": predictions.get("health_advice", "")
+        }
 
-        current = predictions["current"]
-
-        if any(k in message for k in ["weather", "temperature", "forecast"]):
-            reply = (
-                f"🌍 Weather in {city}\n\n"
-                f"🌡️ Temp: {current['temperature']}°C (Feels {current['feels_like']}°C)\n"
-                f"☁️ {current['weather']} - {current['description']}\n"
-                f"💧 Humidity: {current['humidity']}%\n"
-                f"💨 Wind: {current['wind_speed']} m/s\n\n"
-                f"🏭 AQI: {current['aqi_category']} ({current['aqi']})\n\n"
-                f"💡 {predictions.get('health_advice', '')}"
-            )
-            return jsonify({"success": True, "reply": reply, "data": predictions})
-
-        if any(k in message for k in ["aqi", "air", "pollution"]):
-            reply = (
-                f"💨 Air Quality in {city}\n\n"
-                f"AQI: {current['aqi_category']} ({current['aqi']})\n"
-                f"PM2.5: {current['pm2_5']} µg/m³\n"
-                f"PM10: {current['pm10']} µg/m³\n\n"
-                f"💡 {predictions.get('health_advice', '')}"
+        if WEATHER_RE.search(message):
+            reply = WEATHER_TEMPLATE.format_map(ctx)
+        elif AQI_RE.search(message):
+            reply = AQI_TEMPLATE.format_map(ctx)
+        else:
+            reply = None
+
+        if reply is not None:
+            # Only the reply text is serialized here; the data payload is reused
+            return _json_bytes_response(
+                b'{"success":true,"reply":' + orjson.dumps(reply)
+                + b',"data":' + _render(city, predictions) + b'}'
             )
-            return jsonify({"success": True, "reply": reply, "data": predictions})
 
-        return jsonify({
+        return ojsonify({
             "success": True,
             "reply": "Ask me about 🌦️ weather, 🌡️ temperature, or 💨 AQI for any city!"
         })
 
     except Exception as e:
-        return jsonify({"success": False, "reply": str(e)}), 500
+        return ojsonify({"success": False, "reply": str(e)}, 500)
 
 
 @app.route("/api/health")
+@cache.cached(timeout=Config.HEALTH_CACHE_TIMEOUT)
 def health():
-    return jsonify({
+    _refresh_sample_data()
+    return ojsonify({
         "status": "healthy",
         "data_available": has_data
     })
@@ -221,5 +453,6 @@ if __name__ == "__main__":
     print(f"📁 Data: {'Available' if has_data else 'Not available'}")
     print("=" * 60 + "\n")
 
+    # Local debugging only - production runs wsgi:app under gunicorn (see Procfile)
     # 🔒 CRITICAL FIX: disable auto reloader
-    app.run(debug=True, host="0.0.0.0", port=5000, use_reloader=False)
+    app.run(debug=Config.DEBUG, host="0.0.0.0", port=5000, use_reloader=False)
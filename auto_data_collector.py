@@ -4,9 +4,10 @@ Collects weather data every 2 hours
 Run this and let it collect data automatically
 """
 
-import time
+import threading
 from datetime import datetime
-from data_collector import WeatherDataCollector
+from apscheduler.schedulers.background import BackgroundScheduler
+from data_collector import WeatherDataCollector, count_records
 from config import Config
 
 def auto_collect_data(interval_hours=2, total_collections=100):
@@ -30,9 +31,12 @@ def auto_collect_data(interval_hours=2, total_collections=100):
     print("\n💡 Tip: Keep this running in background!")
     print("💡 Press Ctrl+C to stop anytime\n")
     
-    interval_seconds = interval_hours * 3600  # Convert hours to seconds
+    completed = 0
+    done = threading.Event()
     
-    for i in range(total_collections):
+    def collect_once():
+        nonlocal completed
+        i = completed
         try:
             print(f"\n{'='*60}")
             print(f"📊 Collection {i+1}/{total_collections}")
@@ -44,25 +48,38 @@ def auto_collect_data(interval_hours=2, total_collections=100):
             
             if df is not None:
                 print(f"\n✅ Collection {i+1} completed!")
-                print(f"📈 Total records in dataset: {len(df)}")
+                print(f"📈 Total records in dataset: {count_records()}")
             else:
                 print(f"\n⚠️ Collection {i+1} failed - will retry next time")
             
-            # Wait before next collection (unless it's the last one)
-            if i < total_collections - 1:
-                print(f"\n😴 Sleeping for {interval_hours} hours...")
-                print(f"⏰ Next collection at: {datetime.fromtimestamp(time.time() + interval_seconds).strftime('%Y-%m-%d %H:%M:%S')}")
-                time.sleep(interval_seconds)
-            
-        except KeyboardInterrupt:
-            print("\n\n🛑 Data collection stopped by user")
-            print(f"✅ Completed {i+1} collections")
-            break
         except Exception as e:
             print(f"\n❌ Error in collection {i+1}: {e}")
             print("⏳ Will retry in next cycle...")
-            if i < total_collections - 1:
-                time.sleep(interval_seconds)
+        
+        completed += 1
+        if completed >= total_collections:
+            done.set()
+        elif job.next_run_time:
+            print(f"\n😴 Sleeping for {interval_hours} hours...")
+            print(f"⏰ Next collection at: {job.next_run_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    # Fixed-interval trigger keeps wall-clock alignment; a slow run never overlaps the next
+    scheduler = BackgroundScheduler()
+    job = scheduler.add_job(collect_once, 'interval', hours=interval_hours,
+                            max_instances=1, coalesce=True, next_run_time=datetime.now())
+    scheduler.start()
+    
+    try:
+        # Short waits keep the main thread responsive to Ctrl+C
+        while not done.wait(timeout=1):
+            pass
+    except KeyboardInterrupt:
+        print("\n\n🛑 Data collection stopped by user")
+        print(f"✅ Completed {completed} collections")
+        scheduler.shutdown(wait=False)
+        return
+    
+    scheduler.shutdown(wait=False)
     
     print("\n" + "=" * 60)
     print("🎉 AUTOMATED COLLECTION COMPLETED!")
@@ -17,18 +17,42 @@ class Config:
     
     # Default Settings
     DEFAULT_CITY = os.getenv('DEFAULT_CITY', 'Delhi')
+    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() in ('1', 'true', 'yes')
     
     # File Paths
     DATA_DIR = 'data'
     MODEL_DIR = 'models'
     DATASET_FILE = os.path.join(DATA_DIR, 'weather_data.csv')
+    PARQUET_DIR = os.path.join(DATA_DIR, 'weather_data.parquet')
+    DATASET_COUNT_FILE = os.path.join(DATA_DIR, 'weather_data.count.json')
+    GEO_CACHE_FILE = os.path.join(DATA_DIR, 'geo_cache.json')
     
     # Model Files
     TEMP_MODEL_FILE = os.path.join(MODEL_DIR, 'temperature_model.joblib')
     WEATHER_MODEL_FILE = os.path.join(MODEL_DIR, 'weather_classifier.joblib')
+    LABEL_ENCODER_FILE = os.path.join(MODEL_DIR, 'weather_label_encoder.joblib')
     HUMIDITY_MODEL_FILE = os.path.join(MODEL_DIR, 'humidity_model.joblib')
     SCALER_FILE = os.path.join(MODEL_DIR, 'scaler.joblib')
     
+    # OpenWeather request timeouts: background collection retries, live requests fail fast
+    COLLECTOR_TIMEOUT = 10  # seconds
+    LIVE_REQUEST_TIMEOUT = 4  # seconds
+    
+    # Live prediction cache
+    PREDICTION_CACHE_TTL = 60  # seconds
+    PREDICTION_CACHE_SIZE = 64
+    
+    # Flask-Caching response cache (SimpleCache per process, RedisCache when scaled out)
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'SimpleCache')
+    WEATHER_CACHE_TIMEOUT = 30  # seconds
+    HEALTH_CACHE_TIMEOUT = 10  # seconds
+    
+    # Geocoding cache (city coordinates don't move)
+    GEO_CACHE_TTL = 30 * 24 * 3600  # seconds
+    
+    # Parquet copy: appended part files are merged into one once there are this many
+    PARQUET_MAX_PARTS = 24
+    
     # Cities to track
     CITIES = ['Delhi', 'Mumbai', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Ahmedabad']
     
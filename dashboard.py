@@ -3,81 +3,213 @@ Futuristic Analytics Dashboard with ML Training Visualization
 """
 
 import pandas as pd
-import json
+import numpy as np
+import orjson
+import os
+import gzip
+import tempfile
+from contextlib import contextmanager
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from config import Config
 
-def create_dashboard():
-    """Create futuristic analytics dashboard"""
-    
-    try:
-        df = pd.read_csv(Config.DATASET_FILE)
-        print(f"✅ Loaded {len(df)} records")
-    except:
-        print("❌ No data found! Run generate_sample_data.py first")
-        return None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+
+# Only the columns the dashboard reads, with explicit (narrow) dtypes
+DASHBOARD_DTYPES = {
+    'city': 'category',
+    'weather_main': 'category',
+    'temperature': 'float32',
+    'humidity': 'float32',
+    'aqi': 'float32',
+    'pm2_5': 'float32'
+}
+
+DASHBOARD_FILE = 'templates/dashboard.html'
+DASHBOARD_META_FILE = DASHBOARD_FILE + '.meta'
+
+# Rows per read_csv chunk; peak memory is bounded by one chunk, not the dataset
+CHUNK_SIZE = 500_000
+
+# Bytes per Arrow CSV batch (roughly CHUNK_SIZE rows of this dataset)
+ARROW_BLOCK_SIZE = 64 << 20
+
+# Columns whose per-city means the dashboard shows
+MEAN_COLUMNS = ['temperature', 'humidity', 'aqi', 'pm2_5']
+
+# Named aggregations collected per city and chunk...
+TOTALS_SPEC = {f'{col}_sum': (col, 'sum') for col in MEAN_COLUMNS}
+TOTALS_SPEC.update({f'{col}_count': (col, 'count') for col in MEAN_COLUMNS})
+
+# ...and how partial totals combine (across chunks, or across cities for overall stats)
+MERGE_SPEC = dict.fromkeys(TOTALS_SPEC, 'sum')
+
+
+def J(obj):
+    """Serialize a chart payload to JSON text"""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def _read_chunks():
+    """Yield the dashboard's columns in chunks, via Arrow's threaded CSV reader when available"""
+    if pa is None:
+        yield from pd.read_csv(Config.DATASET_FILE, usecols=list(DASHBOARD_DTYPES),
+                               dtype=DASHBOARD_DTYPES, chunksize=CHUNK_SIZE)
+        return
     
-    # Calculate advanced statistics
-    stats = {
-        'total_records': len(df),
-        'cities': df['city'].nunique(),
-        'avg_temp': round(df['temperature'].mean(), 2),
-        'max_temp': round(df['temperature'].max(), 2),
-        'min_temp': round(df['temperature'].min(), 2),
-        'avg_humidity': round(df['humidity'].mean(), 2),
-        'avg_aqi': round(df['aqi'].mean(), 2),
-        'total_cities': list(df['city'].unique())
-    }
+    # Strings come back dictionary-encoded, so batches convert to categoricals
+    column_types = {col: pa.dictionary(pa.int32(), pa.string()) if dtype == 'category'
+                    else pa.from_numpy_dtype(np.dtype(dtype))
+                    for col, dtype in DASHBOARD_DTYPES.items()}
+    reader = pa_csv.open_csv(
+        Config.DATASET_FILE,
+        read_options=pa_csv.ReadOptions(block_size=ARROW_BLOCK_SIZE, use_threads=True),
+        convert_options=pa_csv.ConvertOptions(include_columns=list(DASHBOARD_DTYPES),
+                                              column_types=column_types)
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+
+def _category_counts(values):
+    """Histogram of a categorical column, counted over its integer codes"""
+    codes = values.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories))
+    observed = counts > 0
+    return dict(zip(values.cat.categories[observed], counts[observed].tolist()))
+
+
+def _chunk_totals(chunk):
+    """Per-city partial totals for one chunk"""
+    totals = chunk.groupby('city', sort=False, observed=True).agg(**TOTALS_SPEC)
+    totals.index = totals.index.astype(str)
+    return totals
+
+
+def _aggregate_dataset():
+    """
+    Stream the dataset in chunks, accumulating per-city totals and the weather histogram
     
-    # Prepare comprehensive data for visualizations
-    city_stats = df.groupby('city').agg({
-        'temperature': ['mean', 'min', 'max'],
-        'humidity': 'mean',
-        'aqi': 'mean',
-        'pm2_5': 'mean',
-        'pm10': 'mean',
-        'wind_speed': 'mean',
-        'pressure': 'mean'
-    }).round(2)
+    Returns:
+        (city_totals, weather_counts, total_records) where city_totals
+        holds per-city '<col>_sum'/'<col>_count' for MEAN_COLUMNS
+    """
+    city_totals = None
+    weather_counts = Counter()
+    total_records = 0
     
-    weather_dist = df['weather_main'].value_counts().to_dict()
-    aqi_dist = df['aqi'].value_counts().sort_index().to_dict()
+    # The per-chunk reductions are independent and spend most of their time
+    # in NumPy/pandas kernels, so they run side by side on a small pool
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for chunk in _read_chunks():
+            total_records += len(chunk)
+            
+            totals_future = pool.submit(_chunk_totals, chunk)
+            weather_future = pool.submit(_category_counts, chunk['weather_main'])
+            
+            chunk_totals = totals_future.result()
+            if city_totals is None:
+                city_totals = chunk_totals.astype('float64')
+            else:
+                city_totals = pd.concat([city_totals, chunk_totals]).groupby(level=0, sort=False).agg(MERGE_SPEC)
+            
+            weather_counts.update(weather_future.result())
     
-    # City-wise data
-    temp_by_city = df.groupby('city')['temperature'].mean().sort_values(ascending=False).to_dict()
-    aqi_by_city = df.groupby('city')['aqi'].mean().sort_values(ascending=False).to_dict()
-    humidity_by_city = df.groupby('city')['humidity'].mean().sort_values(ascending=False).to_dict()
-    pm25_by_city = df.groupby('city')['pm2_5'].mean().sort_values(ascending=False).to_dict()
+    return city_totals, weather_counts, total_records
+
+
+def _input_fingerprint():
+    """Identify the dataset (and this generator) the dashboard was built from"""
+    try:
+        return ':'.join(str(v) for v in (
+            os.path.getmtime(Config.DATASET_FILE),
+            os.path.getsize(Config.DATASET_FILE),
+            os.path.getmtime(__file__)
+        ))
+    except OSError:
+        return None
+
+
+@contextmanager
+def _atomic_write(path, mode='w', **kwargs):
+    """Open a unique temp file beside path and swap it in once the block completes"""
+    # A per-writer name keeps concurrent regenerations (workers, greenlets) from
+    # writing into one file or replacing each other's page
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with open(fd, mode, **kwargs) as f:
+            yield f
+        os.chmod(tmp_file, 0o644)
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+
+
+def _write_precompressed(path):
+    """Write .gz (and .br when brotli is installed) copies next to the page"""
+    with open(path, 'rb') as f:
+        data = f.read()
     
-    # Time series data (simulate hourly data)
-    hourly_temp = [round(df['temperature'].mean() + (i-12)*0.5, 2) for i in range(24)]
-    hourly_humidity = [round(df['humidity'].mean() + (i-12)*-0.3, 2) for i in range(24)]
+    variants = {'.gz': gzip.compress(data, compresslevel=9)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
     
-    html_content = f"""
+    for ext, payload in variants.items():
+        with _atomic_write(path + ext, 'wb') as f:
+            f.write(payload)
+
+
+def _read_meta():
+    try:
+        with open(DASHBOARD_META_FILE, encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+# Page sections, defined once at import; only the *_TMPL ones take values
+PAGE_HEAD = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>WeatherML - Advanced Analytics</title>
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link rel="preload" as="script" href="https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js">
     <link href="https://fonts.googleapis.com/css2?family=Orbitron:wght@400;600;700;900&family=Rajdhani:wght@400;500;600;700&display=swap" rel="stylesheet">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js" defer></script>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Rajdhani', sans-serif;
             background: #000000;
             color: #00ff88;
             overflow-x: hidden;
-        }}
+        }
         
         /* Animated Grid Background */
-        .grid-bg {{
+        .grid-bg {
             position: fixed;
             top: 0;
             left: 0;
@@ -89,57 +221,56 @@ def create_dashboard():
             background-size: 50px 50px;
             animation: gridScroll 20s linear infinite;
             z-index: 0;
-        }}
+        }
         
-        @keyframes gridScroll {{
-            0% {{ transform: translate(0, 0); }}
-            100% {{ transform: translate(50px, 50px); }}
-        }}
+        @keyframes gridScroll {
+            0% { transform: translate(0, 0); }
+            100% { transform: translate(50px, 50px); }
+        }
         
         /* Glowing Orbs */
-        .orb {{
+        .orb {
             position: fixed;
             border-radius: 50%;
-            filter: blur(80px);
+            filter: blur(24px);
             opacity: 0.4;
             animation: float 20s ease-in-out infinite;
             z-index: 0;
-        }}
+        }
         
-        .orb1 {{
+        .orb1 {
             width: 500px;
             height: 500px;
             background: radial-gradient(circle, #00ff88, transparent);
             top: -250px;
             left: -250px;
-        }}
+        }
         
-        .orb2 {{
+        .orb2 {
             width: 400px;
             height: 400px;
             background: radial-gradient(circle, #00ffff, transparent);
             bottom: -200px;
             right: -200px;
             animation-delay: -10s;
-        }}
+        }
         
-        @keyframes float {{
-            0%, 100% {{ transform: translate(0, 0) scale(1); }}
-            50% {{ transform: translate(100px, 100px) scale(1.2); }}
-        }}
+        @keyframes float {
+            0%, 100% { transform: translate(0, 0) scale(1); }
+            50% { transform: translate(100px, 100px) scale(1.2); }
+        }
         
-        .container {{
+        .container {
             position: relative;
             z-index: 1;
             max-width: 1900px;
             margin: 0 auto;
             padding: 20px;
-        }}
+        }
         
         /* Top Bar */
-        .top-bar {{
+        .top-bar {
             background: rgba(0, 0, 0, 0.8);
-            backdrop-filter: blur(20px);
             border-bottom: 2px solid rgba(0, 255, 136, 0.3);
             padding: 20px 40px;
             display: flex;
@@ -147,17 +278,17 @@ def create_dashboard():
             align-items: center;
             margin-bottom: 30px;
             box-shadow: 0 0 30px rgba(0, 255, 136, 0.2);
-        }}
+        }
         
-        .logo {{
+        .logo {
             font-family: 'Orbitron', sans-serif;
             font-size: 2em;
             font-weight: 900;
             letter-spacing: 3px;
             text-shadow: 0 0 20px rgba(0, 255, 136, 0.8);
-        }}
+        }
         
-        .nav-btn {{
+        .nav-btn {
             padding: 12px 30px;
             background: linear-gradient(135deg, #00ff88, #00ffff);
             color: #000;
@@ -168,24 +299,23 @@ def create_dashboard():
             text-transform: uppercase;
             letter-spacing: 2px;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .nav-btn:hover {{
+        .nav-btn:hover {
             transform: scale(1.05);
             box-shadow: 0 0 30px rgba(0, 255, 136, 0.8);
-        }}
+        }
         
         /* Stats Grid */
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(5, 1fr);
             gap: 20px;
             margin-bottom: 30px;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             background: rgba(0, 0, 0, 0.7);
-            backdrop-filter: blur(20px);
             border: 2px solid rgba(0, 255, 136, 0.3);
             border-radius: 15px;
             padding: 25px;
@@ -193,9 +323,9 @@ def create_dashboard():
             transition: all 0.4s ease;
             position: relative;
             overflow: hidden;
-        }}
+        }
         
-        .stat-card::before {{
+        .stat-card::before {
             content: '';
             position: absolute;
             top: -50%;
@@ -204,26 +334,27 @@ def create_dashboard():
             height: 200%;
             background: radial-gradient(circle, rgba(0, 255, 136, 0.1) 0%, transparent 70%);
             animation: rotate 15s linear infinite;
-        }}
+        }
         
-        @keyframes rotate {{
-            from {{ transform: rotate(0deg); }}
-            to {{ transform: rotate(360deg); }}
-        }}
+        @keyframes rotate {
+            from { transform: rotate(0deg); }
+            to { transform: rotate(360deg); }
+        }
         
-        .stat-card:hover {{
+        .stat-card:hover {
+            backdrop-filter: blur(8px);
             border-color: #00ff88;
             box-shadow: 0 0 40px rgba(0, 255, 136, 0.4);
             transform: translateY(-5px);
-        }}
+        }
         
-        .stat-icon {{
+        .stat-icon {
             font-size: 2.5em;
             margin-bottom: 15px;
             filter: drop-shadow(0 0 15px rgba(0, 255, 136, 0.8));
-        }}
+        }
         
-        .stat-value {{
+        .stat-value {
             font-size: 2.5em;
             font-weight: 700;
             font-family: 'Orbitron', sans-serif;
@@ -231,101 +362,108 @@ def create_dashboard():
             margin: 10px 0;
             position: relative;
             z-index: 1;
-        }}
+        }
         
-        .stat-label {{
+        .stat-label {
             color: rgba(0, 255, 136, 0.6);
             font-size: 0.9em;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
+        }
         
         /* Charts Grid */
-        .charts-grid {{
+        .charts-grid {
             display: grid;
             grid-template-columns: repeat(2, 1fr);
             gap: 25px;
             margin-bottom: 25px;
-        }}
+        }
         
-        .chart-card {{
+        .chart-card {
             background: rgba(0, 0, 0, 0.7);
-            backdrop-filter: blur(20px);
             border: 2px solid rgba(0, 255, 136, 0.3);
             border-radius: 20px;
             padding: 30px;
             transition: all 0.4s ease;
-        }}
+        }
         
-        .chart-card:hover {{
+        .chart-card:hover {
+            backdrop-filter: blur(8px);
             border-color: #00ff88;
             box-shadow: 0 0 50px rgba(0, 255, 136, 0.3);
-        }}
+        }
         
-        .chart-card.full {{
+        .chart-card.full {
             grid-column: 1 / -1;
-        }}
+        }
         
-        .chart-header {{
+        .chart-header {
             display: flex;
             align-items: center;
             gap: 15px;
             margin-bottom: 25px;
             padding-bottom: 15px;
             border-bottom: 2px solid rgba(0, 255, 136, 0.2);
-        }}
+        }
         
-        .chart-icon {{
+        .chart-icon {
             font-size: 2em;
             filter: drop-shadow(0 0 10px rgba(0, 255, 136, 0.8));
-        }}
+        }
         
-        .chart-title {{
+        .chart-title {
             font-family: 'Orbitron', sans-serif;
             font-size: 1.4em;
             font-weight: 600;
             text-transform: uppercase;
             letter-spacing: 2px;
-        }}
+        }
         
-        .chart-container {{
+        .chart-container {
             position: relative;
             height: 350px;
-        }}
+        }
         
-        .chart-container.large {{
+        .chart-container.large {
             height: 450px;
-        }}
+        }
         
         /* Scrollbar */
-        ::-webkit-scrollbar {{
+        ::-webkit-scrollbar {
             width: 10px;
-        }}
+        }
         
-        ::-webkit-scrollbar-track {{
+        ::-webkit-scrollbar-track {
             background: rgba(0, 255, 136, 0.05);
-        }}
+        }
         
-        ::-webkit-scrollbar-thumb {{
+        ::-webkit-scrollbar-thumb {
             background: linear-gradient(135deg, #00ff88, #00ffff);
             border-radius: 10px;
-        }}
+        }
+        
+        /* Keep the page static for users who ask for less motion */
+        @media (prefers-reduced-motion: reduce) {
+            .grid-bg, .orb, .stat-card::before {
+                animation: none;
+            }
+        }
         
-        @media (max-width: 1400px) {{
-            .stats-grid {{
+        @media (max-width: 1400px) {
+            .stats-grid {
                 grid-template-columns: repeat(3, 1fr);
-            }}
-        }}
+            }
+        }
         
-        @media (max-width: 1024px) {{
-            .charts-grid {{
+        @media (max-width: 1024px) {
+            .charts-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
             
-            .stats-grid {{
+            .stats-grid {
                 grid-template-columns: repeat(2, 1fr);
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
@@ -339,40 +477,44 @@ def create_dashboard():
             <a href="/" class="nav-btn">← Back</a>
         </div>
         
-        <!-- Stats Cards -->
+"""
+
+STATS_TMPL = """        <!-- Stats Cards -->
         <div class="stats-grid">
             <div class="stat-card">
                 <div class="stat-icon">📊</div>
-                <div class="stat-value">{stats['total_records']}</div>
+                <div class="stat-value">{total_records}</div>
                 <div class="stat-label">Total Records</div>
             </div>
             
             <div class="stat-card">
                 <div class="stat-icon">🏙️</div>
-                <div class="stat-value">{stats['cities']}</div>
+                <div class="stat-value">{cities}</div>
                 <div class="stat-label">Cities</div>
             </div>
             
             <div class="stat-card">
                 <div class="stat-icon">🌡️</div>
-                <div class="stat-value">{stats['avg_temp']}°</div>
+                <div class="stat-value">{avg_temp}°</div>
                 <div class="stat-label">Avg Temp</div>
             </div>
             
             <div class="stat-card">
                 <div class="stat-icon">💧</div>
-                <div class="stat-value">{stats['avg_humidity']}%</div>
+                <div class="stat-value">{avg_humidity}%</div>
                 <div class="stat-label">Avg Humidity</div>
             </div>
             
             <div class="stat-card">
                 <div class="stat-icon">💨</div>
-                <div class="stat-value">{stats['avg_aqi']}</div>
+                <div class="stat-value">{avg_aqi}</div>
                 <div class="stat-label">Avg AQI</div>
             </div>
         </div>
         
-        <!-- Charts -->
+"""
+
+CHART_CANVASES = """        <!-- Charts -->
         <div class="charts-grid">
             <div class="chart-card">
                 <div class="chart-header">
@@ -457,18 +599,22 @@ def create_dashboard():
     </div>
     
     <script>
+        // Chart.js loads deferred, so draw once the document has been parsed
+        document.addEventListener('DOMContentLoaded', () => {
         Chart.defaults.color = '#00ff88';
         Chart.defaults.borderColor = 'rgba(0, 255, 136, 0.2)';
         Chart.defaults.font.family = "'Rajdhani', sans-serif";
         
-        // Temperature Chart
+"""
+
+TEMP_CHART_TMPL = """        // Temperature Chart
         new Chart(document.getElementById('tempChart'), {{
             type: 'bar',
             data: {{
-                labels: {json.dumps(list(temp_by_city.keys()))},
+                labels: {labels},
                 datasets: [{{
                     label: 'Temperature (°C)',
-                    data: {json.dumps(list(temp_by_city.values()))},
+                    data: {values},
                     backgroundColor: 'rgba(0, 255, 136, 0.6)',
                     borderColor: '#00ff88',
                     borderWidth: 2,
@@ -493,14 +639,16 @@ def create_dashboard():
             }}
         }});
         
-        // AQI Chart
+"""
+
+AQI_CHART_TMPL = """        // AQI Chart
         new Chart(document.getElementById('aqiChart'), {{
             type: 'polarArea',
             data: {{
-                labels: {json.dumps(list(aqi_by_city.keys()))},
+                labels: {labels},
                 datasets: [{{
                     label: 'AQI',
-                    data: {json.dumps(list(aqi_by_city.values()))},
+                    data: {values},
                     backgroundColor: [
                         'rgba(0, 255, 136, 0.6)',
                         'rgba(0, 255, 255, 0.6)',
@@ -530,14 +678,16 @@ def create_dashboard():
             }}
         }});
         
-        // Humidity Chart
+"""
+
+HUMIDITY_CHART_TMPL = """        // Humidity Chart
         new Chart(document.getElementById('humidityChart'), {{
             type: 'line',
             data: {{
-                labels: {json.dumps(list(humidity_by_city.keys()))},
+                labels: {labels},
                 datasets: [{{
                     label: 'Humidity (%)',
-                    data: {json.dumps(list(humidity_by_city.values()))},
+                    data: {values},
                     backgroundColor: 'rgba(0, 255, 255, 0.2)',
                     borderColor: '#00ffff',
                     borderWidth: 3,
@@ -567,13 +717,15 @@ def create_dashboard():
             }}
         }});
         
-        // Weather Distribution
+"""
+
+WEATHER_CHART_TMPL = """        // Weather Distribution
         new Chart(document.getElementById('weatherChart'), {{
             type: 'doughnut',
             data: {{
-                labels: {json.dumps(list(weather_dist.keys()))},
+                labels: {labels},
                 datasets: [{{
-                    data: {json.dumps(list(weather_dist.values()))},
+                    data: {values},
                     backgroundColor: [
                         'rgba(0, 255, 136, 0.8)',
                         'rgba(0, 255, 255, 0.8)',
@@ -597,8 +749,10 @@ def create_dashboard():
             }}
         }});
         
-        // Multi-Metric Comparison
-        const cities = {json.dumps(list(temp_by_city.keys()))};
+"""
+
+COMPARISON_CHART_TMPL = """        // Multi-Metric Comparison
+        const cities = {labels};
         new Chart(document.getElementById('comparisonChart'), {{
             type: 'line',
             data: {{
@@ -606,7 +760,7 @@ def create_dashboard():
                 datasets: [
                     {{
                         label: 'Temperature',
-                        data: {json.dumps(list(temp_by_city.values()))},
+                        data: {temp_values},
                         borderColor: '#00ff88',
                         backgroundColor: 'rgba(0, 255, 136, 0.1)',
                         borderWidth: 3,
@@ -616,7 +770,7 @@ def create_dashboard():
                     }},
                     {{
                         label: 'Humidity',
-                        data: {json.dumps(list(humidity_by_city.values()))},
+                        data: {humidity_values},
                         borderColor: '#00ffff',
                         backgroundColor: 'rgba(0, 255, 255, 0.1)',
                         borderWidth: 3,
@@ -654,7 +808,9 @@ def create_dashboard():
             }}
         }});
         
-        // Hourly Forecast
+"""
+
+HOURLY_CHART_TMPL = """        // Hourly Forecast
         new Chart(document.getElementById('hourlyChart'), {{
             type: 'line',
             data: {{
@@ -662,7 +818,7 @@ def create_dashboard():
                 datasets: [
                     {{
                         label: 'Temperature',
-                        data: {json.dumps(hourly_temp)},
+                        data: {temp_values},
                         borderColor: '#00ff88',
                         backgroundColor: 'rgba(0, 255, 136, 0.2)',
                         borderWidth: 3,
@@ -671,7 +827,7 @@ def create_dashboard():
                     }},
                     {{
                         label: 'Humidity',
-                        data: {json.dumps(hourly_humidity)},
+                        data: {humidity_values},
                         borderColor: '#00ffff',
                         backgroundColor: 'rgba(0, 255, 255, 0.2)',
                         borderWidth: 3,
@@ -697,14 +853,16 @@ def create_dashboard():
             }}
         }});
         
-        // PM2.5 Chart
+"""
+
+PM25_CHART_TMPL = """        // PM2.5 Chart
         new Chart(document.getElementById('pm25Chart'), {{
             type: 'bar',
             data: {{
-                labels: {json.dumps(list(pm25_by_city.keys()))},
+                labels: {labels},
                 datasets: [{{
                     label: 'PM2.5',
-                    data: {json.dumps(list(pm25_by_city.values()))},
+                    data: {values},
                     backgroundColor: 'rgba(255, 0, 68, 0.7)',
                     borderColor: '#ff0044',
                     borderWidth: 2,
@@ -729,21 +887,14 @@ def create_dashboard():
             }}
         }});
         
-        // Radar Chart
+"""
+
+RADAR_CHART_TMPL = """        // Radar Chart
         new Chart(document.getElementById('radarChart'), {{
             type: 'radar',
             data: {{
                 labels: ['Temperature', 'Humidity', 'AQI', 'PM2.5', 'Wind'],
-                datasets: {json.dumps([{
-                    'label': city,
-                    'data': [
-                        float(temp_by_city.get(city, 0)),
-                        float(humidity_by_city.get(city, 0)),
-                        float(aqi_by_city.get(city, 0)) * 20,
-                        float(pm25_by_city.get(city, 0)),
-                        20
-                    ]
-                } for city in list(temp_by_city.keys())[:3]])}
+                datasets: {datasets}
             }},
             options: {{
                 responsive: true,
@@ -758,14 +909,112 @@ def create_dashboard():
                 }}
             }}
         }});
+"""
+
+PAGE_END = """        });
     </script>
 </body>
 </html>
 """
+
+
+def create_dashboard():
+    """Create futuristic analytics dashboard"""
+    
+    # Skip regeneration when the dataset hasn't changed since the last build
+    fingerprint = _input_fingerprint()
+    if fingerprint and fingerprint == _read_meta() and os.path.exists(DASHBOARD_FILE):
+        print(f"✅ Dashboard up to date: {DASHBOARD_FILE}")
+        return DASHBOARD_FILE
+    
+    try:
+        city_totals, weather_counts, total_records = _aggregate_dataset()
+    except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError,
+            ValueError, KeyError) as e:
+        # A CSV missing the dashboard's columns raises ValueError (pandas) or
+        # KeyError (Arrow); Arrow's parse errors are ValueErrors as well
+        print(f"❌ Could not load data: {e}")
+        city_totals = None
+    
+    if city_totals is None:
+        print("❌ No data found! Run generate_sample_data.py first")
+        return None
+    print(f"✅ Loaded {total_records} records")
+    
+    sums = city_totals[[f'{col}_sum' for col in MEAN_COLUMNS]].set_axis(MEAN_COLUMNS, axis=1)
+    counts = city_totals[[f'{col}_count' for col in MEAN_COLUMNS]].set_axis(MEAN_COLUMNS, axis=1)
+    
+    # One fused reduction over the per-city totals for every overall statistic
+    overall = city_totals.agg(MERGE_SPEC)
+    overall_means = pd.Series({col: overall[f'{col}_sum'] / overall[f'{col}_count']
+                               for col in MEAN_COLUMNS})
+    
+    # Calculate the statistics the summary cards show
+    stats = {
+        'total_records': total_records,
+        'cities': len(city_totals),
+        'avg_temp': round(float(overall_means['temperature']), 2),
+        'avg_humidity': round(float(overall_means['humidity']), 2),
+        'avg_aqi': round(float(overall_means['aqi']), 2)
+    }
+    
+    # Prepare comprehensive data for visualizations
+    city_means = (sums / counts).rename(columns={'temperature': 'temp_mean'})
+    city_stats = city_means.round(2)
+    
+    weather_dist = dict(weather_counts.most_common())
+    
+    # City-wise data, kept as sorted Series so payloads serialize straight from numpy
+    temp_by_city = city_stats['temp_mean'].sort_values(ascending=False)
+    aqi_by_city = city_stats['aqi'].sort_values(ascending=False)
+    humidity_by_city = city_stats['humidity'].sort_values(ascending=False)
+    pm25_by_city = city_stats['pm2_5'].sort_values(ascending=False)
+    
+    # Time series data (simulate hourly data)
+    hour_offsets = np.arange(24) - 12
+    hourly_temp = np.round(overall_means['temperature'] + hour_offsets * 0.5, 2)
+    hourly_humidity = np.round(overall_means['humidity'] - hour_offsets * 0.3, 2)
+    
+    # Radar datasets for the three warmest cities, sliced in one vectorized lookup
+    # (AQI is scaled from the unrounded means, then rounded with the rest)
+    radar_df = city_means.loc[temp_by_city.index[:3], ['temp_mean', 'humidity', 'aqi', 'pm2_5']].fillna(0)
+    radar_df['aqi'] *= 20
+    radar_df = radar_df.round(2)
+    radar_df['wind'] = 20
+    radar_datasets = [{'label': city, 'data': row}
+                      for city, row in zip(radar_df.index, radar_df.to_numpy().tolist())]
+    
+    dashboard_file = DASHBOARD_FILE
+    # Write the page section by section instead of building one big string,
+    # into a temp file swapped in atomically so readers never see a partial page
+    with _atomic_write(dashboard_file, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        f.write(PAGE_HEAD)
+        f.write(STATS_TMPL.format(**stats))
+        f.write(CHART_CANVASES)
+        f.write(TEMP_CHART_TMPL.format(labels=J(temp_by_city.index.tolist()),
+                                       values=J(temp_by_city.to_numpy())))
+        f.write(AQI_CHART_TMPL.format(labels=J(aqi_by_city.index.tolist()),
+                                      values=J(aqi_by_city.to_numpy())))
+        f.write(HUMIDITY_CHART_TMPL.format(labels=J(humidity_by_city.index.tolist()),
+                                           values=J(humidity_by_city.to_numpy())))
+        f.write(WEATHER_CHART_TMPL.format(labels=J(list(weather_dist)),
+                                          values=J(list(weather_dist.values()))))
+        f.write(COMPARISON_CHART_TMPL.format(labels=J(temp_by_city.index.tolist()),
+                                             temp_values=J(temp_by_city.to_numpy()),
+                                             humidity_values=J(humidity_by_city.to_numpy())))
+        f.write(HOURLY_CHART_TMPL.format(temp_values=J(hourly_temp),
+                                         humidity_values=J(hourly_humidity)))
+        f.write(PM25_CHART_TMPL.format(labels=J(pm25_by_city.index.tolist()),
+                                       values=J(pm25_by_city.to_numpy())))
+        f.write(RADAR_CHART_TMPL.format(datasets=J(radar_datasets)))
+        f.write(PAGE_END)
+    
+    # Compress once here so every page view can be served precompressed
+    _write_precompressed(dashboard_file)
     
-    dashboard_file = 'templates/dashboard.html'
-    with open(dashboard_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    if fingerprint:
+        with _atomic_write(DASHBOARD_META_FILE, 'w', encoding='utf-8') as f:
+            f.write(fingerprint)
     
     print(f"✅ Futuristic dashboard created: {dashboard_file}")
     return dashboard_file
@@ -1,26 +1,255 @@
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+from pandas.api.types import union_categoricals
 from datetime import datetime
+import json
+import orjson
 import os
+import pyarrow.parquet as pq
+import random
+import tempfile
+import threading
+import time
 from config import Config
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+STRING_COLUMNS = ['city', 'weather_main', 'weather_description']
+
+# Rows per read_csv chunk when the dataset is loaded from the CSV
+CSV_CHUNK_SIZE = 100_000
+
+# Transient API failures retried by the async collector
+RETRY_STATUSES = {429, 500, 502, 503, 504, 529}
+RETRY_ATTEMPTS = 5
+RETRY_MAX_DELAY = 30  # seconds
+
+
+def write_json_atomic(path, obj):
+    """Write JSON through a unique temp file beside path, then swap it in"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    # A per-write name keeps concurrent writers (other collectors, workers) from
+    # interleaving into, or replacing, each other's half-written file
+    fd, tmp_file = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(obj, f)
+        # mkstemp creates owner-only files; keep the usual data-file permissions
+        os.chmod(tmp_file, 0o644)
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+
+
+def parquet_parts():
+    """Paths of the Parquet copy's part files"""
+    if not os.path.isdir(Config.PARQUET_DIR):
+        return []
+    return [os.path.join(Config.PARQUET_DIR, name)
+            for name in os.listdir(Config.PARQUET_DIR) if name.endswith('.parquet')]
+
+
+def has_parquet_dataset():
+    """Check whether the Parquet copy of the dataset has been written"""
+    return bool(parquet_parts())
+
+
+def parquet_in_sync(parts=None):
+    """Check that the Parquet copy holds as many rows as the (canonical) CSV"""
+    parts = parquet_parts() if parts is None else parts
+    if not parts:
+        return False
+    try:
+        # Row counts come from the part files' footers, no data is read
+        rows = sum(pq.read_metadata(part).num_rows for part in parts)
+    except (OSError, ValueError):
+        return False
+    return rows == count_records()
+
+
+def load_dataset(columns=None, dtype=None):
+    """
+    Load the weather dataset, preferring the Parquet copy while it matches the CSV
+    
+    Args:
+        columns: Columns to read (all when None)
+        dtype: Optional {column: dtype} to narrow to; string columns load as categories
+    """
+    dtypes = {col: 'category' for col in STRING_COLUMNS
+              if columns is None or col in columns}
+    dtypes.update(dtype or {})
+    
+    if parquet_in_sync():
+        df = pd.read_parquet(Config.PARQUET_DIR, engine='pyarrow',
+                             columns=columns, dtype_backend='pyarrow')
+        return df.astype(dtypes)
+    
+    # Parse the CSV in typed chunks so the parser never holds it as text/object columns
+    parse_dates = ['timestamp'] if columns is None or 'timestamp' in columns else False
+    chunks = list(pd.read_csv(Config.DATASET_FILE, usecols=columns, dtype=dtypes,
+                              parse_dates=parse_dates, chunksize=CSV_CHUNK_SIZE))
+    # Chunks see different category sets, and concat would fall back to
+    # object; align them on the union so the columns stay categorical
+    for col, col_dtype in dtypes.items():
+        if col_dtype == 'category' and len(chunks) > 1:
+            categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True, copy=False)
+
+
+def store_record_count(count):
+    """Record the CSV row count in the sidecar file, tagged with the CSV size"""
+    try:
+        write_json_atomic(Config.DATASET_COUNT_FILE,
+                          {'count': count, 'size': os.path.getsize(Config.DATASET_FILE)})
+    except OSError as e:
+        print(f"⚠️ Could not save record count: {e}")
+
+
+def count_records():
+    """Number of data rows in the CSV dataset, from the sidecar when it is current"""
+    if not os.path.exists(Config.DATASET_FILE):
+        return 0
+    try:
+        with open(Config.DATASET_COUNT_FILE, encoding='utf-8') as f:
+            sidecar = json.load(f)
+        # A size mismatch means the CSV was written by something else
+        if sidecar['size'] == os.path.getsize(Config.DATASET_FILE):
+            return sidecar['count']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
+    with open(Config.DATASET_FILE, 'rb') as f:
+        count = max(sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b'')) - 1, 0)
+    store_record_count(count)
+    return count
+
+
+def append_csv(df):
+    """Append rows to the CSV dataset without reading it back"""
+    count = count_records()
+    if os.path.exists(Config.DATASET_FILE) and os.path.getsize(Config.DATASET_FILE):
+        # Match the existing header so columns line up
+        with open(Config.DATASET_FILE, encoding='utf-8') as f:
+            header = f.readline().strip().split(',')
+        df.reindex(columns=header).to_csv(Config.DATASET_FILE, mode='a', header=False, index=False)
+    else:
+        count = 0
+        df.to_csv(Config.DATASET_FILE, index=False)
+    store_record_count(count + len(df))
+
+
+def save_parquet(df, overwrite=False):
+    """Write records as a new part file of the Parquet dataset"""
+    os.makedirs(Config.PARQUET_DIR, exist_ok=True)
+    if overwrite:
+        for name in os.listdir(Config.PARQUET_DIR):
+            if name.endswith('.parquet'):
+                os.remove(os.path.join(Config.PARQUET_DIR, name))
+    
+    # Keep one schema across part files so they read back as a single table
+    df = df.copy()
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    for col in df.columns:
+        if col in STRING_COLUMNS:
+            df[col] = df[col].astype('string')
+        elif col != 'timestamp':
+            df[col] = df[col].astype('float64')
+    
+    part = os.path.join(Config.PARQUET_DIR, f"part-{datetime.now():%Y%m%d%H%M%S%f}.parquet")
+    df.to_parquet(part, engine='pyarrow', index=False)
+    return part
+
+
 class WeatherDataCollector:
     """Collects real-time weather and AQI data from OpenWeather API"""
     
-    def __init__(self):
+    def __init__(self, retry=True):
+        """
+        Args:
+            retry: Retry transient failures (background collection); with False,
+                each call is one short attempt so a request path fails fast
+        """
         self.api_key = Config.OPENWEATHER_API_KEY
         if not self.api_key:
             raise ValueError("OPENWEATHER_API_KEY not found in .env file!")
         
+        self.retry = retry
+        self.timeout = Config.COLLECTOR_TIMEOUT if retry else Config.LIVE_REQUEST_TIMEOUT
+        
+        # One session so geo/weather/AQI calls reuse the same TCP/TLS connection,
+        # with transient failures retried at the adapter when enabled
+        self.session = requests.Session()
+        retries = (Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+                   if retry else 0)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Persistent geocoding cache: {city key: {'lat', 'lon', 'ts'}}
+        self._geo_cache_lock = threading.Lock()
+        self._geo_cache = self._load_geo_cache()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self):
+        """Release the pooled HTTP connections"""
+        self.session.close()
+    
+    def _load_geo_cache(self):
+        try:
+            with open(Config.GEO_CACHE_FILE, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _cached_coordinates(self, city_name):
+        """Coordinates from the geocoding cache, or None on a miss/expired entry"""
+        entry = self._geo_cache.get(city_name.strip().lower())
+        if entry and time.time() - entry['ts'] < Config.GEO_CACHE_TTL:
+            return entry['lat'], entry['lon']
+        return None
+    
+    def _store_coordinates(self, city_name, lat, lon):
+        """Remember coordinates and persist the cache atomically"""
+        with self._geo_cache_lock:
+            self._geo_cache[city_name.strip().lower()] = {'lat': lat, 'lon': lon, 'ts': time.time()}
+            try:
+                write_json_atomic(Config.GEO_CACHE_FILE, self._geo_cache)
+            except OSError as e:
+                print(f"⚠️ Could not save geocoding cache: {e}")
+        
     def get_coordinates(self, city_name):
         """Get latitude and longitude for a city"""
+        cached = self._cached_coordinates(city_name)
+        if cached:
+            return cached
+        
         try:
             url = f"{Config.GEO_API_URL}?q={city_name}&limit=1&appid={self.api_key}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if data:
+                self._store_coordinates(city_name, data[0]['lat'], data[0]['lon'])
                 return data[0]['lat'], data[0]['lon']
             return None, None
         except Exception as e:
@@ -36,22 +265,104 @@ class WeatherDataCollector:
             
             # Weather data
             weather_url = f"{Config.WEATHER_API_URL}?lat={lat}&lon={lon}&appid={self.api_key}&units=metric"
-            weather_response = requests.get(weather_url, timeout=10)
+            weather_response = self.session.get(weather_url, timeout=self.timeout)
             weather_response.raise_for_status()
-            weather_data = weather_response.json()
+            weather_data = orjson.loads(weather_response.content)
             
             # Air pollution data
             aqi_url = f"{Config.AIR_POLLUTION_API_URL}?lat={lat}&lon={lon}&appid={self.api_key}"
-            aqi_response = requests.get(aqi_url, timeout=10)
+            aqi_response = self.session.get(aqi_url, timeout=self.timeout)
             aqi_response.raise_for_status()
-            aqi_data = aqi_response.json()
+            aqi_data = orjson.loads(aqi_response.content)
             
             return self._parse_data(city_name, weather_data, aqi_data)
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"Error fetching data for {city_name}: {e}")
             return None
     
+    async def _get_json_async(self, session, url, attempts=None):
+        """GET a JSON body, retrying rate limits, 5xx and network errors with jittered backoff"""
+        if attempts is None:
+            attempts = RETRY_ATTEMPTS if self.retry else 1
+        for attempt in range(attempts):
+            try:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    return orjson.loads(await response.read())
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES or attempt == attempts - 1:
+                    raise
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                if attempt == attempts - 1:
+                    raise
+            
+            # asyncio.sleep, so the other cities keep fetching during the backoff
+            await asyncio.sleep(min(random.uniform(2, 4) * (attempt + 1), RETRY_MAX_DELAY))
+    
+    async def get_coordinates_async(self, session, city_name):
+        """Get latitude and longitude for a city (async)"""
+        cached = self._cached_coordinates(city_name)
+        if cached:
+            return cached
+        
+        try:
+            url = f"{Config.GEO_API_URL}?q={city_name}&limit=1&appid={self.api_key}"
+            data = await self._get_json_async(session, url)
+            
+            if data:
+                self._store_coordinates(city_name, data[0]['lat'], data[0]['lon'])
+                return data[0]['lat'], data[0]['lon']
+            return None, None
+        except Exception as e:
+            print(f"Error getting coordinates for {city_name}: {e}")
+            return None, None
+    
+    async def fetch_weather_data_async(self, session, city_name):
+        """Fetch real-time weather data (async); weather and AQI are requested together"""
+        try:
+            lat, lon = await self.get_coordinates_async(session, city_name)
+            if not lat or not lon:
+                return None
+            
+            weather_url = f"{Config.WEATHER_API_URL}?lat={lat}&lon={lon}&appid={self.api_key}&units=metric"
+            aqi_url = f"{Config.AIR_POLLUTION_API_URL}?lat={lat}&lon={lon}&appid={self.api_key}"
+            weather_data, aqi_data = await asyncio.gather(
+                self._get_json_async(session, weather_url),
+                self._get_json_async(session, aqi_url)
+            )
+            
+            return self._parse_data(city_name, weather_data, aqi_data)
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            print(f"Error fetching data for {city_name}: {e}")
+            return None
+    
+    async def fetch_all_async(self, cities):
+        """Fetch every city concurrently over one shared aiohttp session"""
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=16)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            return await asyncio.gather(
+                *(self.fetch_weather_data_async(session, city) for city in cities),
+                return_exceptions=True
+            )
+    
+    def fetch_many(self, cities):
+        """Fetch real-time data for several cities at once; None marks a failed city"""
+        # Network-bound, so fetch all cities concurrently: on one event loop when
+        # aiohttp is available, otherwise on a thread pool over the shared session
+        if aiohttp is not None:
+            results = asyncio.run(self.fetch_all_async(cities))
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(cities), 16) or 1) as pool:
+                results = list(pool.map(self.fetch_weather_data, cities))
+        
+        for city, result in zip(cities, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching data for {city}: {result}")
+        return [result if isinstance(result, dict) else None for result in results]
+    
     def _parse_data(self, city, weather_data, aqi_data):
         """Parse API response into structured format"""
         try:
@@ -94,43 +405,53 @@ class WeatherDataCollector:
             return None
     
     def collect_and_save(self, cities=None):
-        """Collect data for multiple cities and save to CSV"""
+        """Collect data for multiple cities and append it to the dataset; returns the new rows"""
         if cities is None:
             cities = Config.CITIES
         
-        all_data = []
-        
-        for city in cities:
-            print(f"Fetching data for {city}...")
-            data = self.fetch_weather_data(city)
-            if data:
-                all_data.append(data)
+        print(f"Fetching data for {', '.join(cities)}...")
+        all_data = [data for data in self.fetch_many(cities) if data]
         
         if all_data:
             df = pd.DataFrame(all_data)
             
-            # Append to existing file or create new
-            if os.path.exists(Config.DATASET_FILE):
-                existing_df = pd.read_csv(Config.DATASET_FILE)
-                df = pd.concat([existing_df, df], ignore_index=True)
+            # The CSV is canonical; the Parquet copy takes one part file per
+            # collection while it matches, and is reseeded from the CSV otherwise
+            parts = parquet_parts()
+            in_sync = parquet_in_sync(parts)
+            
+            # Only the new rows are written; the history is never re-read
+            append_csv(df)
             
-            df.to_csv(Config.DATASET_FILE, index=False)
-            print(f"\n✅ Data saved! Total records: {len(df)}")
+            try:
+                if in_sync and len(parts) < Config.PARQUET_MAX_PARTS:
+                    save_parquet(df)
+                elif in_sync:
+                    # Merge the small appended parts (and the new rows) into one file
+                    history = pd.read_parquet(Config.PARQUET_DIR, engine='pyarrow')
+                    save_parquet(pd.concat([history, df], ignore_index=True), overwrite=True)
+                else:
+                    print("🔄 Parquet copy out of date, reseeding it from the CSV")
+                    save_parquet(pd.read_csv(Config.DATASET_FILE), overwrite=True)
+            except (OSError, ValueError) as e:
+                # Left out of sync, so readers use the CSV until the next reseed
+                print(f"⚠️ Could not update the Parquet copy: {e}")
+            print(f"\n✅ Data saved! Total records: {count_records()}")
             return df
         
         return None
 
 if __name__ == "__main__":
     Config.init_app()
-    collector = WeatherDataCollector()
     
     # Collect data
     print("Starting data collection...\n")
-    df = collector.collect_and_save()
+    with WeatherDataCollector() as collector:
+        df = collector.collect_and_save()
     
     if df is not None:
         print("\n📊 Data Summary:")
         print(df.tail())
-        print(f"\nDataset shape: {df.shape}")
+        print(f"\nCollected: {df.shape}, total records: {count_records()}")
     else:
         print("❌ No data collected!")
\ No newline at end of file
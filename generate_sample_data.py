@@ -7,14 +7,15 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from config import Config
-import random
+from data_collector import save_parquet, store_record_count
 
-def generate_sample_data(num_records=500):
+def generate_sample_data(num_records=500, seed=42):
     """
     Generate realistic sample weather data for training
     
     Args:
         num_records: Number of sample records to generate
+        seed: Random seed so repeated runs produce the same dataset (None for fresh data)
     """
     Config.init_app()
     
@@ -33,91 +34,96 @@ def generate_sample_data(num_records=500):
         'Haze': ['haze', 'smoke']
     }
     
-    data = []
+    # Base temperature varies by city
+    base_temps = {
+        'Delhi': 25, 'Mumbai': 28, 'Bangalore': 23,
+        'Chennai': 30, 'Kolkata': 27, 'Hyderabad': 26,
+        'Pune': 24, 'Ahmedabad': 28
+    }
+    
+    # Every column is sampled as a whole array rather than row by row
+    rng = np.random.default_rng(seed)
+    n = num_records
     start_date = datetime.now() - timedelta(days=30)
+    timestamps = np.datetime64(start_date) + np.arange(n).astype('timedelta64[h]')
+    
+    # Cities and conditions are drawn as codes and masked through per-label lookups
+    city_idx = rng.integers(0, len(cities), n)
+    base_temp = np.array([base_temps.get(c, 25) for c in cities])[city_idx]
+    
+    # Add seasonal and daily variation
+    hour = (start_date.hour + np.arange(n)) % 24
+    temp_variation = np.sin((hour - 6) * np.pi / 12) * 5  # Daily cycle
+    temperature = base_temp + temp_variation + rng.normal(0, 2, n)
+    
+    # Weather conditions affect other parameters
+    weather_idx = rng.integers(0, len(weather_conditions), n)
+    
+    # Pick a description within each row's condition from one flat label array
+    description_labels = [d for w in weather_conditions for d in weather_descriptions[w]]
+    description_counts = np.array([len(weather_descriptions[w]) for w in weather_conditions])
+    description_offsets = np.concatenate(([0], np.cumsum(description_counts)[:-1]))
+    description_idx = (description_offsets[weather_idx]
+                       + (rng.random(n) * description_counts[weather_idx]).astype(int))
+    
+    # Humidity (higher for rain, lower for clear)
+    wet = np.isin(weather_conditions, ['Rain', 'Drizzle'])[weather_idx]
+    clear = (np.array(weather_conditions) == 'Clear')[weather_idx]
+    humidity = np.select([wet, clear], [rng.integers(70, 95, n), rng.integers(30, 60, n)],
+                         rng.integers(50, 80, n))
+    clouds = np.select([wet, clear], [rng.integers(80, 100, n), rng.integers(0, 20, n)],
+                       rng.integers(40, 80, n))
+    
+    # AQI (varies by city - Delhi/Kolkata worse, Bangalore better)
+    aqi = np.select(
+        [np.isin(cities, ['Delhi', 'Kolkata'])[city_idx], np.isin(cities, ['Bangalore', 'Pune'])[city_idx]],
+        [rng.choice([2, 3, 4, 5], n, p=[0.1, 0.3, 0.4, 0.2]),
+         rng.choice([1, 2, 3], n, p=[0.3, 0.5, 0.2])],
+        rng.choice([2, 3, 4], n, p=[0.3, 0.5, 0.2])
+    )
+    
+    # PM2.5 based on AQI: look up each row's range bounds, then draw them all at once
+    pm2_5_low = np.array([0, 30, 60, 90, 120])
+    pm2_5_high = np.array([30, 60, 90, 120, 250])
+    pm2_5 = rng.uniform(pm2_5_low[aqi - 1], pm2_5_high[aqi - 1])
+    pm10 = pm2_5 * 1.5 + rng.normal(0, 10, n)
+    
+    # Create DataFrame straight from the column arrays; repeated labels are stored as categories
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        'city': pd.Categorical.from_codes(city_idx, categories=cities),
+        'temperature': np.round(temperature, 2),
+        'feels_like': np.round(temperature + rng.uniform(-2, 2, n), 2),
+        'temp_min': np.round(temperature - rng.uniform(1, 3, n), 2),
+        'temp_max': np.round(temperature + rng.uniform(1, 3, n), 2),
+        'pressure': (1013 + rng.normal(0, 10, n)).astype(int),
+        'humidity': humidity,
+        'wind_speed': np.round(rng.uniform(0.5, 8, n), 2),
+        'wind_deg': rng.integers(0, 360, n),
+        'clouds': clouds,
+        'weather_main': pd.Categorical.from_codes(weather_idx, categories=weather_conditions),
+        'weather_description': np.array(description_labels)[description_idx],
+        'aqi': aqi,
+        'pm2_5': np.round(pm2_5, 2),
+        'pm10': np.round(np.maximum(pm10, 0), 2),
+        'co': np.round(rng.uniform(200, 1000, n), 2),
+        'no2': np.round(rng.uniform(10, 50, n), 2),
+        'o3': np.round(rng.uniform(20, 100, n), 2),
+        'so2': np.round(rng.uniform(5, 30, n), 2)
+    })
     
-    for i in range(num_records):
-        city = random.choice(cities)
-        timestamp = start_date + timedelta(hours=i)
-        
-        # Base temperature varies by city
-        base_temp = {
-            'Delhi': 25, 'Mumbai': 28, 'Bangalore': 23,
-            'Chennai': 30, 'Kolkata': 27, 'Hyderabad': 26,
-            'Pune': 24, 'Ahmedabad': 28
-        }.get(city, 25)
-        
-        # Add seasonal and daily variation
-        hour = timestamp.hour
-        temp_variation = np.sin((hour - 6) * np.pi / 12) * 5  # Daily cycle
-        temperature = base_temp + temp_variation + np.random.normal(0, 2)
-        
-        # Weather conditions affect other parameters
-        weather_main = random.choice(weather_conditions)
-        description = random.choice(weather_descriptions[weather_main])
-        
-        # Humidity (higher for rain, lower for clear)
-        if weather_main == 'Rain' or weather_main == 'Drizzle':
-            humidity = np.random.randint(70, 95)
-            clouds = np.random.randint(80, 100)
-        elif weather_main == 'Clear':
-            humidity = np.random.randint(30, 60)
-            clouds = np.random.randint(0, 20)
-        else:
-            humidity = np.random.randint(50, 80)
-            clouds = np.random.randint(40, 80)
-        
-        # AQI (varies by city - Delhi/Kolkata worse, Bangalore better)
-        if city in ['Delhi', 'Kolkata']:
-            aqi = np.random.choice([2, 3, 4, 5], p=[0.1, 0.3, 0.4, 0.2])
-        elif city in ['Bangalore', 'Pune']:
-            aqi = np.random.choice([1, 2, 3], p=[0.3, 0.5, 0.2])
-        else:
-            aqi = np.random.choice([2, 3, 4], p=[0.3, 0.5, 0.2])
-        
-        # PM2.5 based on AQI
-        pm2_5_ranges = {1: (0, 30), 2: (30, 60), 3: (60, 90), 4: (90, 120), 5: (120, 250)}
-        pm2_5 = np.random.uniform(*pm2_5_ranges[aqi])
-        pm10 = pm2_5 * 1.5 + np.random.normal(0, 10)
-        
-        record = {
-            'timestamp': timestamp,
-            'city': city,
-            'temperature': round(temperature, 2),
-            'feels_like': round(temperature + np.random.uniform(-2, 2), 2),
-            'temp_min': round(temperature - np.random.uniform(1, 3), 2),
-            'temp_max': round(temperature + np.random.uniform(1, 3), 2),
-            'pressure': int(1013 + np.random.normal(0, 10)),
-            'humidity': humidity,
-            'wind_speed': round(np.random.uniform(0.5, 8), 2),
-            'wind_deg': np.random.randint(0, 360),
-            'clouds': clouds,
-            'weather_main': weather_main,
-            'weather_description': description,
-            'aqi': aqi,
-            'pm2_5': round(pm2_5, 2),
-            'pm10': round(max(0, pm10), 2),
-            'co': round(np.random.uniform(200, 1000), 2),
-            'no2': round(np.random.uniform(10, 50), 2),
-            'o3': round(np.random.uniform(20, 100), 2),
-            'so2': round(np.random.uniform(5, 30), 2)
-        }
-        
-        data.append(record)
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    
-    # Save to CSV
+    # Save to CSV and replace the Parquet copy
     df.to_csv(Config.DATASET_FILE, index=False)
+    store_record_count(len(df))
+    save_parquet(df, overwrite=True)
     
     print(f"\n✅ Generated {num_records} sample records!")
-    print(f"📁 Saved to: {Config.DATASET_FILE}")
+    print(f"📁 Saved to: {Config.DATASET_FILE} and {Config.PARQUET_DIR}")
     print(f"\n📊 Data Summary:")
     print(f"   Cities: {df['city'].nunique()}")
     print(f"   Date range: {df['timestamp'].min()} to {df['timestamp'].max()}")
     print(f"   Temperature range: {df['temperature'].min():.1f}°C to {df['temperature'].max():.1f}°C")
-    print(f"   Weather conditions: {df['weather_main'].unique()}")
+    print(f"   Weather conditions: {df['weather_main'].cat.categories.tolist()}")
     print(f"\n🚀 You can now train your ML models!")
     print("=" * 60)
     
@@ -1,50 +1,100 @@
 import joblib
+import os
 import numpy as np
+from numba import njit
 from datetime import datetime
 from config import Config
 from data_collector import WeatherDataCollector
 
+# Indexed by AQI level (1-5); index 0 is the "Unknown" sentinel
+AQI_CATEGORIES = ("Unknown", "Good", "Fair", "Moderate", "Poor", "Very Poor")
+
+
+# Indexed by the class returned from _advice_class
+HEALTH_ADVICE = (
+    "✅ Air quality is good. Safe for outdoor activities.",
+    "⚡ Moderate air quality. Sensitive groups should limit outdoor activities.",
+    "⚠️ Air quality is poor. Avoid outdoor activities. Wear a mask if going outside.",
+)
+
+
+def aqi_category(aqi):
+    """Convert AQI number to category"""
+    return AQI_CATEGORIES[int(aqi)] if aqi in range(1, 6) else "Unknown"
+
+
+@njit(cache=True)
+def _advice_class(aqi, pm25):
+    """Health advice class for an AQI level and PM2.5 reading (0 good, 1 moderate, 2 poor)"""
+    if aqi >= 4.0 or pm25 > 55.0:
+        return 2
+    if aqi == 3.0:
+        return 1
+    return 0
+
+
 class WeatherPredictor:
     """Make predictions using trained models"""
     
+    # Loaded artifacts shared by every instance in the process, keyed by (path, mtime)
+    _model_cache = {}
+    
     def __init__(self):
         self.load_models()
-        self.collector = WeatherDataCollector()
+        # Predictions are served on request, so live fetches fail fast instead of retrying
+        self.collector = WeatherDataCollector(retry=False)
+    
+    @classmethod
+    def _load_artifact(cls, path):
+        """joblib.load once per process; a retrained (newer) file is picked up automatically"""
+        key = (path, os.path.getmtime(path))
+        artifact = cls._model_cache.get(key)
+        if artifact is None:
+            # Loaded into the heap, not memory-mapped: sklearn copies tree arrays
+            # anyway, and a mapping would dangle if the file were retrained
+            artifact = joblib.load(path)
+            for stale in [k for k in cls._model_cache if k[0] == path]:
+                del cls._model_cache[stale]
+            cls._model_cache[key] = artifact
+        return artifact
+    
+    @classmethod
+    def preload(cls):
+        """Load every trained artifact into the process cache ahead of the first request"""
+        for path in (Config.TEMP_MODEL_FILE, Config.WEATHER_MODEL_FILE, Config.LABEL_ENCODER_FILE,
+                     Config.HUMIDITY_MODEL_FILE, Config.SCALER_FILE):
+            if os.path.exists(path):
+                cls._load_artifact(path)
         
     def load_models(self):
         """Load trained models"""
         try:
-            self.temp_model = joblib.load(Config.TEMP_MODEL_FILE)
-            self.weather_clf = joblib.load(Config.WEATHER_MODEL_FILE)
-            self.humidity_model = joblib.load(Config.HUMIDITY_MODEL_FILE)
-            self.scaler = joblib.load(Config.SCALER_FILE)
+            self.temp_model = self._load_artifact(Config.TEMP_MODEL_FILE)
+            self.weather_clf = self._load_artifact(Config.WEATHER_MODEL_FILE)
+            # Classifiers trained before the encoder was saved have no label mapping
+            self.label_encoder = (self._load_artifact(Config.LABEL_ENCODER_FILE)
+                                  if os.path.exists(Config.LABEL_ENCODER_FILE) else None)
+            self.humidity_model = self._load_artifact(Config.HUMIDITY_MODEL_FILE)
+            # Only temperature models trained before scaling was dropped come with a scaler
+            self.scaler = (self._load_artifact(Config.SCALER_FILE)
+                           if os.path.exists(Config.SCALER_FILE) else None)
             print("✅ Models loaded successfully!")
         except FileNotFoundError:
             print("❌ Models not found! Train models first using train_model.py")
             self.temp_model = None
             self.weather_clf = None
+            self.label_encoder = None
             self.humidity_model = None
             self.scaler = None
     
     def get_aqi_category(self, aqi):
         """Convert AQI number to category"""
-        categories = {
-            1: "Good",
-            2: "Fair", 
-            3: "Moderate",
-            4: "Poor",
-            5: "Very Poor"
-        }
-        return categories.get(aqi, "Unknown")
+        return aqi_category(aqi)
     
     def get_health_advice(self, aqi, pm25):
         """Provide health advice based on AQI"""
-        if aqi >= 4 or (pm25 and pm25 > 55):
-            return "⚠️ Air quality is poor. Avoid outdoor activities. Wear a mask if going outside."
-        elif aqi == 3:
-            return "⚡ Moderate air quality. Sensitive groups should limit outdoor activities."
-        else:
-            return "✅ Air quality is good. Safe for outdoor activities."
+        # Missing PM2.5 readings never trigger the poor-air advice on their own
+        return HEALTH_ADVICE[_advice_class(float(aqi), float(pm25 or 0.0))]
     
     def predict_for_city(self, city_name):
         """Make predictions for a city using real-time data"""
@@ -56,9 +106,21 @@ class WeatherPredictor:
         if not live_data:
             return {"error": f"Could not fetch data for {city_name}"}
         
-        # Extract features
-        now = datetime.now()
-        features_temp = np.array([[
+        return self._predict_from_live([live_data])[0]
+    
+    def predict_for_cities(self, city_names):
+        """Make predictions for several cities, fetching and predicting them as one batch"""
+        print(f"\n🌍 Fetching real-time data for {', '.join(city_names)}...")
+        live_rows = self.collector.fetch_many(city_names)
+        
+        fetched = [live_data for live_data in live_rows if live_data]
+        predicted = iter(self._predict_from_live(fetched))
+        return [next(predicted) if live_data else {"error": f"Could not fetch data for {city}"}
+                for city, live_data in zip(city_names, live_rows)]
+    
+    def _features(self, live_data, now):
+        """Feature rows for the temperature, weather and humidity models"""
+        features_temp = [
             live_data['feels_like'],
             live_data['temp_min'],
             live_data['temp_max'],
@@ -70,9 +132,9 @@ class WeatherPredictor:
             live_data['pm10'] or 0,
             now.hour,
             now.month
-        ]])
+        ]
         
-        features_weather = np.array([[
+        features_weather = [
             live_data['temperature'],
             live_data['humidity'],
             live_data['pressure'],
@@ -82,9 +144,9 @@ class WeatherPredictor:
             live_data['aqi'],
             now.hour,
             now.month
-        ]])
+        ]
         
-        features_humidity = np.array([[
+        features_humidity = [
             live_data['temperature'],
             live_data['pressure'],
             live_data['wind_speed'],
@@ -92,11 +154,16 @@ class WeatherPredictor:
             live_data['pm2_5'] or 0,
             now.hour,
             now.month
-        ]])
+        ]
         
-        # Make predictions
-        predictions = {
-            'city': city_name,
+        return features_temp, features_weather, features_humidity
+    
+    def _predict_from_live(self, live_rows):
+        """Build predictions for live readings, calling each model once for the whole batch"""
+        now = datetime.now()
+        
+        all_predictions = [{
+            'city': live_data['city'],
             'timestamp': str(live_data['timestamp']),
             'current': {
                 'temperature': live_data['temperature'],
@@ -112,34 +179,43 @@ class WeatherPredictor:
                 'pm2_5': live_data['pm2_5'],
                 'pm10': live_data['pm10']
             }
-        }
-        
-        # ML Predictions
-        if self.temp_model and self.scaler:
-            features_temp_scaled = self.scaler.transform(features_temp)
-            pred_temp = self.temp_model.predict(features_temp_scaled)[0]
-            predictions['ml_predictions'] = {
-                'predicted_temperature': round(pred_temp, 2),
-                'temp_difference': round(pred_temp - live_data['temperature'], 2)
-            }
+        } for live_data in live_rows]
+        
+        # ML Predictions: stack every city's features into (N, F) matrices
+        if live_rows and self.temp_model:
+            features = [self._features(live_data, now) for live_data in live_rows]
+            features_temp, features_weather, features_humidity = (
+                np.array(rows, dtype=np.float32) for rows in zip(*features)
+            )
             
-            if self.humidity_model:
-                pred_humidity = self.humidity_model.predict(features_humidity)[0]
-                predictions['ml_predictions']['predicted_humidity'] = round(pred_humidity, 2)
+            if self.scaler is not None:
+                features_temp = self.scaler.transform(features_temp)
+            pred_temps = self.temp_model.predict(features_temp)
+            pred_humidities = self.humidity_model.predict(features_humidity) if self.humidity_model else None
+            pred_weathers = (self.label_encoder.inverse_transform(self.weather_clf.predict(features_weather))
+                             if self.weather_clf and self.label_encoder else None)
             
-            if self.weather_clf:
-                pred_weather_code = self.weather_clf.predict(features_weather)[0]
-                weather_classes = ['Clear', 'Clouds', 'Rain', 'Drizzle', 'Snow', 'Thunderstorm']
-                if pred_weather_code < len(weather_classes):
-                    predictions['ml_predictions']['predicted_weather'] = weather_classes[pred_weather_code]
+            for i, (predictions, live_data) in enumerate(zip(all_predictions, live_rows)):
+                pred_temp = pred_temps[i]
+                predictions['ml_predictions'] = {
+                    'predicted_temperature': round(pred_temp, 2),
+                    'temp_difference': round(pred_temp - live_data['temperature'], 2)
+                }
+                
+                if pred_humidities is not None:
+                    predictions['ml_predictions']['predicted_humidity'] = round(pred_humidities[i], 2)
+                
+                if pred_weathers is not None:
+                    predictions['ml_predictions']['predicted_weather'] = pred_weathers[i]
         
         # Health advice
-        predictions['health_advice'] = self.get_health_advice(
-            live_data['aqi'], 
-            live_data['pm2_5']
-        )
+        for predictions, live_data in zip(all_predictions, live_rows):
+            predictions['health_advice'] = self.get_health_advice(
+                live_data['aqi'],
+                live_data['pm2_5']
+            )
         
-        return predictions
+        return all_predictions
     
     def display_predictions(self, predictions):
         """Display predictions in a readable format"""
@@ -1,36 +1,85 @@
-import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier, GradientBoostingRegressor
+from sklearn.preprocessing import LabelEncoder
+from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier, HistGradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score, accuracy_score, classification_report
 import joblib
+import os
+import tempfile
 from config import Config
+from data_collector import load_dataset
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from xgboost import XGBRegressor
+except ImportError:  # fall back to scikit-learn's histogram booster
+    XGBRegressor = None
+
+
+def for_serving(model):
+    """Drop the training-time thread pool so single-row predictions stay cheap"""
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = None
+    return model
+
+
+def dump_artifact(obj, path):
+    """joblib.dump through a unique temp file, swapped in so a running server never reads a partial file"""
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        joblib.dump(obj, tmp_file)
+        os.chmod(tmp_file, 0o644)
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+
+
+# Columns the models train on, read with explicit dtypes (no type inference)
+TRAINING_DTYPES = {
+    'temperature': 'float32',
+    'feels_like': 'float32',
+    'temp_min': 'float32',
+    'temp_max': 'float32',
+    'pressure': 'float32',
+    'humidity': 'float32',
+    'wind_speed': 'float32',
+    'clouds': 'float32',
+    'weather_main': 'category',
+    'aqi': 'float32',
+    'pm2_5': 'float32',
+    'pm10': 'float32'
+}
+
 class WeatherModelTrainer:
     """Train ML models for weather prediction"""
     
     def __init__(self):
         Config.init_app()
-        self.scaler = StandardScaler()
         self.label_encoder = LabelEncoder()
         
     def load_data(self):
         """Load and prepare dataset"""
         try:
-            df = pd.read_csv(Config.DATASET_FILE)
+            # Only the training columns, already narrowed (Parquet when in sync, else the CSV)
+            df = load_dataset(['timestamp', *TRAINING_DTYPES], dtype=TRAINING_DTYPES)
             print(f"✅ Loaded {len(df)} records")
             
-            # Handle missing values
-            df = df.fillna(df.mean(numeric_only=True))
+            # Handle missing values: column means computed once, filled in place
+            column_means = df.mean(numeric_only=True)
+            df.fillna(column_means, inplace=True)
             
-            # Convert timestamp
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df['hour'] = df['timestamp'].dt.hour
-            df['day_of_year'] = df['timestamp'].dt.dayofyear
-            df['month'] = df['timestamp'].dt.month
+            # Timestamp features from one datetime64 view, stored as small ints
+            ts = df['timestamp'].to_numpy(dtype='datetime64[s]')
+            days = ts.astype('datetime64[D]')
+            df['hour'] = (ts.astype('int64') // 3600 % 24).astype('int8')
+            df['day_of_year'] = ((days - ts.astype('datetime64[Y]')).astype('int64') + 1).astype('int16')
+            df['month'] = (ts.astype('datetime64[M]').astype('int64') % 12 + 1).astype('int8')
             
             return df
             
@@ -45,28 +94,29 @@ class WeatherModelTrainer:
         features = ['feels_like', 'temp_min', 'temp_max', 'pressure', 'humidity', 
                    'wind_speed', 'clouds', 'pm2_5', 'pm10', 'hour', 'month']
         
-        X = df[features].values
+        X = df[features].to_numpy(dtype=np.float32)
         y = df['temperature'].values
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Train models
+        # Train models (tree splits are scale-invariant, so features stay unscaled)
         models = {
-            'RandomForest': RandomForestRegressor(n_estimators=200, max_depth=15, random_state=42),
-            'GradientBoosting': GradientBoostingRegressor(n_estimators=150, max_depth=10, random_state=42)
+            'RandomForest': RandomForestRegressor(n_estimators=200, max_depth=15, random_state=42, n_jobs=-1),
         }
+        # Histogram-based boosting; XGBoost trains multi-threaded when it is installed
+        if XGBRegressor is not None:
+            models['XGBoost'] = XGBRegressor(tree_method='hist', n_estimators=500, max_depth=10,
+                                             learning_rate=0.05, n_jobs=-1, random_state=42)
+        else:
+            models['GradientBoosting'] = HistGradientBoostingRegressor(max_iter=150, max_depth=10, random_state=42)
         
         best_model = None
         best_score = float('inf')
         
         for name, model in models.items():
-            model.fit(X_train_scaled, y_train)
-            y_pred = model.predict(X_test_scaled)
+            model.fit(X_train, y_train)
+            y_pred = model.predict(X_test)
             
             mae = mean_absolute_error(y_test, y_pred)
             rmse = np.sqrt(mean_squared_error(y_test, y_pred))
@@ -82,8 +132,10 @@ class WeatherModelTrainer:
                 best_model = model
         
         # Save best model
-        joblib.dump(best_model, Config.TEMP_MODEL_FILE)
-        joblib.dump(self.scaler, Config.SCALER_FILE)
+        dump_artifact(for_serving(best_model), Config.TEMP_MODEL_FILE)
+        # A scaler left over from an older model would now be applied to raw features
+        if os.path.exists(Config.SCALER_FILE):
+            os.remove(Config.SCALER_FILE)
         print(f"\n✅ Temperature model saved! (MAE: {best_score:.3f}°C)")
         
         return best_model
@@ -95,7 +147,7 @@ class WeatherModelTrainer:
         features = ['temperature', 'humidity', 'pressure', 'wind_speed', 'clouds', 
                    'pm2_5', 'aqi', 'hour', 'month']
         
-        X = df[features].values
+        X = df[features].to_numpy(dtype=np.float32)
         y = df['weather_main'].values
         
         # Encode labels
@@ -105,7 +157,7 @@ class WeatherModelTrainer:
         X_train, X_test, y_train, y_test = train_test_split(X, y_encoded, test_size=0.2, random_state=42)
         
         # Train classifier
-        clf = RandomForestClassifier(n_estimators=200, max_depth=15, random_state=42)
+        clf = RandomForestClassifier(n_estimators=200, max_depth=15, random_state=42, n_jobs=-1)
         clf.fit(X_train, y_train)
         
         # Evaluate
@@ -118,7 +170,9 @@ class WeatherModelTrainer:
                                    target_names=self.label_encoder.classes_))
         
         # Save model
-        joblib.dump(clf, Config.WEATHER_MODEL_FILE)
+        dump_artifact(for_serving(clf), Config.WEATHER_MODEL_FILE)
+        # The predictor needs the same code -> label mapping the classifier was trained on
+        dump_artifact(self.label_encoder, Config.LABEL_ENCODER_FILE)
         print(f"\n✅ Weather classifier saved! (Accuracy: {accuracy:.3f})")
         
         return clf
@@ -130,13 +184,13 @@ class WeatherModelTrainer:
         features = ['temperature', 'pressure', 'wind_speed', 'clouds', 
                    'pm2_5', 'hour', 'month']
         
-        X = df[features].values
+        X = df[features].to_numpy(dtype=np.float32)
         y = df['humidity'].values
         
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
         # Train model
-        model = RandomForestRegressor(n_estimators=150, max_depth=12, random_state=42)
+        model = RandomForestRegressor(n_estimators=150, max_depth=12, random_state=42, n_jobs=-1)
         model.fit(X_train, y_train)
         
         # Evaluate
@@ -148,7 +202,7 @@ class WeatherModelTrainer:
         print(f"  RMSE: {rmse:.3f}%")
         
         # Save model
-        joblib.dump(model, Config.HUMIDITY_MODEL_FILE)
+        dump_artifact(for_serving(model), Config.HUMIDITY_MODEL_FILE)
         print(f"\n✅ Humidity model saved! (MAE: {mae:.3f}%)")
         
         return model
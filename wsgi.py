@@ -0,0 +1,15 @@
+"""
+WSGI entrypoint for production servers
+Run with: gunicorn --preload -k gevent -w 4 --worker-connections 1000 wsgi:app
+"""
+
+# Patch before anything imports socket/ssl/threading, so the app's sessions
+# and locks are cooperative under the gevent worker
+from gevent import monkey
+monkey.patch_all()
+
+# Load the trained models up front; under --preload the workers inherit them
+from predict import WeatherPredictor
+WeatherPredictor.preload()
+
+from app import app
\ No newline at end of file